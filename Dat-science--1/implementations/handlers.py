@@ -4,8 +4,64 @@ Base handler classes for working with databases.
 Contains classes: Handler, UploadHandler, QueryHandler
 """
 
+import requests
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Optional
+from pandas import DataFrame
+from requests.adapters import HTTPAdapter
+
+
+# Escapes for text placed inside a double-quoted SPARQL literal
+_SPARQL_LITERAL_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def _create_session(pool_maxsize: int = 32) -> requests.Session:
+    """
+    Create an HTTP session whose connections are kept alive and pooled.
+
+    Args:
+        pool_maxsize (int): Maximum number of connections kept per host
+
+    Returns:
+        requests.Session: Session with a pooling adapter for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Successful uploads seen per endpoint, used to invalidate cached query results
+_endpoint_generations: Dict[str, int] = {}
+
+
+def _endpoint_generation(url: str) -> int:
+    """
+    Return how many times data has been pushed to an endpoint in this process.
+
+    Args:
+        url (str): Endpoint URL
+
+    Returns:
+        int: Upload counter for the endpoint
+    """
+    return _endpoint_generations.get(url, 0)
+
+
+def _bump_endpoint_generation(url: str) -> None:
+    """
+    Record that data was pushed to an endpoint, invalidating cached results.
+
+    Args:
+        url (str): Endpoint URL
+    """
+    _endpoint_generations[url] = _endpoint_generations.get(url, 0) + 1
 
 
 class Handler:
@@ -79,6 +135,19 @@ class QueryHandler(Handler):
         Returns:
             DataFrame: Entity data or an empty DataFrame
         """
-       
-        from pandas import DataFrame
         return DataFrame()
+
+    def supportsId(self, entity_id: str) -> bool:
+        """
+        Tell whether the database may contain an entity with this identifier.
+
+        Handlers that can rule identifiers out cheaply override this so that
+        lookups by identifier skip them; the default never rules one out.
+
+        Args:
+            entity_id (str): Entity identifier
+
+        Returns:
+            bool: False only if the entity is certainly absent
+        """
+        return True
@@ -1,38 +1,44 @@
 # -*- coding: utf-8 -*-
 """
 Main implementation module for the scientific journals analysis system.
-Contains imports of all necessary classes.
+Re-exports all necessary classes; the submodules are imported lazily on
+first attribute access (PEP 562).
 """
 
-# Data model class imports
-from .models import IdentifiableEntity, Journal, Category, Area
+import importlib
 
-# Base handler imports
-from .handlers import Handler, UploadHandler, QueryHandler
-
-# Upload handler imports
-from .upload_handlers import JournalUploadHandler, CategoryUploadHandler
-
-# Query handler imports
-from .query_handlers import JournalQueryHandler, CategoryQueryHandler
-
-# Query engine imports
-from .query_engines import BasicQueryEngine, FullQueryEngine
-
-# Export all classes for use in test.py
-__all__ = [
+# Submodule that defines each exported class
+_MODULE_MAP = {
     # Data model
-    'IdentifiableEntity', 'Journal', 'Category', 'Area',
-    
+    'IdentifiableEntity': 'models', 'Journal': 'models',
+    'Category': 'models', 'Area': 'models',
+
     # Base handlers
-    'Handler', 'UploadHandler', 'QueryHandler',
-    
+    'Handler': 'handlers', 'UploadHandler': 'handlers', 'QueryHandler': 'handlers',
+
     # Upload handlers
-    'JournalUploadHandler', 'CategoryUploadHandler',
-    
+    'JournalUploadHandler': 'upload_handlers', 'CategoryUploadHandler': 'upload_handlers',
+
     # Query handlers
-    'JournalQueryHandler', 'CategoryQueryHandler',
-    
+    'JournalQueryHandler': 'query_handlers', 'CategoryQueryHandler': 'query_handlers',
+
     # Query engines
-    'BasicQueryEngine', 'FullQueryEngine'
-]
+    'BasicQueryEngine': 'query_engines', 'FullQueryEngine': 'query_engines',
+}
+
+# Export all classes for use in test.py
+__all__ = list(_MODULE_MAP)
+
+
+def __getattr__(name: str):
+    """Import the submodule defining `name` and cache the class in this module."""
+    if name not in _MODULE_MAP:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module('.' + _MODULE_MAP[name], __package__)
+    obj = getattr(module, name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -4,25 +4,42 @@ Data model for the scientific journals analysis system.
 Contains classes: IdentifiableEntity, Journal, Category, Area
 """
 
-from typing import List, Optional, Union
+from typing import Iterable, Optional, Set, Tuple
 
 
 class IdentifiableEntity:
     """
     Base class for all identifiable entities.
+
+    Two entities of the same class are equal when they share the first
+    identifier, so the first addId/setId call fixes the entity identity.
     """
+
+    __slots__ = ('_ids', '_id_set')
     
     def __init__(self):
-        self._ids: List[str] = []
+        self._ids: Tuple[str, ...] = ()
+        self._id_set: Set[str] = set()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IdentifiableEntity):
+            return NotImplemented
+        if self is other:
+            return True
+        return (type(self) is type(other) and bool(self._ids) and bool(other._ids)
+                and self._ids[0] == other._ids[0])
+
+    def __hash__(self) -> int:
+        return hash(self._ids[0]) if self._ids else 0
     
-    def getIds(self) -> List[str]:
+    def getIds(self) -> Tuple[str, ...]:
         """
-        Return the list of entity identifiers.
+        Return the entity identifiers.
 
         Returns:
-            List[str]: List of identifiers
+            Tuple[str, ...]: Read-only sequence of identifiers
         """
-        return self._ids.copy()
+        return self._ids
     
     def addId(self, entity_id: str) -> None:
         """
@@ -31,8 +48,9 @@ class IdentifiableEntity:
         Args:
             entity_id (str): Identifier to add
         """
-        if entity_id and entity_id not in self._ids:
-            self._ids.append(entity_id)
+        if entity_id and entity_id not in self._id_set:
+            self._ids += (entity_id,)
+            self._id_set.add(entity_id)
     
     def setId(self, entity_id: str) -> None:
         """
@@ -41,32 +59,44 @@ class IdentifiableEntity:
         Args:
             entity_id (str): Identifier
         """
-        self._ids = [entity_id] if entity_id else []
+        self._ids = (entity_id,) if entity_id else ()
+        self._id_set = set(self._ids)
 
 
 class Journal(IdentifiableEntity):
     """
     Journal class with metadata from DOAJ.
     """
+
+    # Bits of the packed boolean flags
+    _SEAL_BIT = 1
+    _APC_BIT = 2
+
+    __slots__ = (
+        '_title', '_languages', '_language_set', '_publisher', '_flags', '_licence',
+        '_categories', '_areas', '_category_set', '_area_set',
+    )
     
     def __init__(self):
         super().__init__()
         self._title: str = ""
-        self._languages: List[str] = []
+        self._languages: Tuple[str, ...] = ()
+        self._language_set: Set[str] = set()
         self._publisher: Optional[str] = None
-        self._seal: bool = False
+        self._flags: int = 0
         self._licence: str = ""
-        self._apc: bool = False
-        self._categories: List['Category'] = []
-        self._areas: List['Area'] = []
+        self._categories: Tuple['Category', ...] = ()
+        self._areas: Tuple['Area', ...] = ()
+        self._category_set: Set['Category'] = set()
+        self._area_set: Set['Area'] = set()
     
     def getTitle(self) -> str:
         """Return the journal title."""
         return self._title
     
-    def getLanguages(self) -> List[str]:
-        """Return the journal languages list."""
-        return self._languages.copy()
+    def getLanguages(self) -> Tuple[str, ...]:
+        """Return the journal languages."""
+        return self._languages
     
     def getPublisher(self) -> Optional[str]:
         """Return the journal publisher."""
@@ -74,7 +104,7 @@ class Journal(IdentifiableEntity):
     
     def hasDOASeal(self) -> bool:
         """Check for presence of DOAJ Seal."""
-        return self._seal
+        return bool(self._flags & Journal._SEAL_BIT)
     
     def getLicence(self) -> str:
         """Return the journal licence."""
@@ -82,23 +112,30 @@ class Journal(IdentifiableEntity):
     
     def hasAPC(self) -> bool:
         """Check whether Article Processing Charge (APC) applies."""
-        return self._apc
+        return bool(self._flags & Journal._APC_BIT)
     
-    def getCategories(self) -> List['Category']:
+    def getCategories(self) -> Tuple['Category', ...]:
         """Return related categories."""
-        return self._categories.copy()
+        return self._categories
     
-    def getAreas(self) -> List['Area']:
+    def getAreas(self) -> Tuple['Area', ...]:
         """Return related areas."""
-        return self._areas.copy()
+        return self._areas
     
     def setTitle(self, title: str) -> None:
         """Set the journal title."""
         self._title = title
     
-    def setLanguages(self, languages: List[str]) -> None:
-        """Set the journal languages."""
-        self._languages = languages.copy() if languages else []
+    def setLanguages(self, languages: Iterable[str]) -> None:
+        """Set the journal languages, dropping duplicates."""
+        self._languages = tuple(dict.fromkeys(languages)) if languages else ()
+        self._language_set = set(self._languages)
+    
+    def addLanguage(self, language: str) -> None:
+        """Add a language to the journal."""
+        if language and language not in self._language_set:
+            self._languages += (language,)
+            self._language_set.add(language)
     
     def setPublisher(self, publisher: Optional[str]) -> None:
         """Set the journal publisher."""
@@ -106,7 +143,7 @@ class Journal(IdentifiableEntity):
     
     def setSeal(self, seal: bool) -> None:
         """Set the presence of DOAJ Seal."""
-        self._seal = seal
+        self._flags = (self._flags | Journal._SEAL_BIT) if seal else (self._flags & ~Journal._SEAL_BIT)
     
     def setLicence(self, licence: str) -> None:
         """Set the journal licence."""
@@ -114,23 +151,27 @@ class Journal(IdentifiableEntity):
     
     def setAPC(self, apc: bool) -> None:
         """Set whether APC applies."""
-        self._apc = apc
+        self._flags = (self._flags | Journal._APC_BIT) if apc else (self._flags & ~Journal._APC_BIT)
     
     def addCategory(self, category: 'Category') -> None:
         """Add a category to the journal."""
-        if category and category not in self._categories:
-            self._categories.append(category)
+        if category and category not in self._category_set:
+            self._categories += (category,)
+            self._category_set.add(category)
     
     def addArea(self, area: 'Area') -> None:
         """Add an area to the journal."""
-        if area and area not in self._areas:
-            self._areas.append(area)
+        if area and area not in self._area_set:
+            self._areas += (area,)
+            self._area_set.add(area)
 
 
 class Category(IdentifiableEntity):
     """
     Category class from Scimago Journal Rank.
     """
+
+    __slots__ = ('_quartile',)
     
     def __init__(self):
         super().__init__()
@@ -149,6 +190,8 @@ class Area(IdentifiableEntity):
     """
     Area class from Scimago Journal Rank.
     """
+
+    __slots__ = ()
     
     def __init__(self):
         super().__init__()
@@ -4,20 +4,57 @@ Query engines for performing complex queries against databases.
 Contains classes: BasicQueryEngine, FullQueryEngine
 """
 
-import math
-from typing import Dict, Iterable, List, Set, Optional
+from functools import lru_cache, wraps
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Set, Optional, Tuple
 from .models import Journal, Category, Area, IdentifiableEntity
 from .query_handlers import JournalQueryHandler, CategoryQueryHandler
 
 
+def _safe_query(description: str, default: Any = ...):
+    """
+    Decorate a public query method so that errors are reported and a default returned.
+
+    Args:
+        description (str): Action described in the error message
+        default: Value returned on error; a new empty list when omitted
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                print(f"Error while {description}: {e}")
+                return [] if default is ... else default
+        return wrapper
+    return decorator
+
+
 class BasicQueryEngine:
     """
     Basic query engine for working with journals and categories.
     """
+
+    # Columns read from the journal handlers' DataFrames
+    _JOURNAL_COLUMNS = ('issn', 'eissn', 'journal', 'title', 'language',
+                        'publisher', 'seal', 'licence', 'apc')
+    # Journal fields kept in the columnar journal store
+    _JOURNAL_FIELDS = ('issn', 'eissn', 'title', 'publisher', 'seal', 'licence', 'apc')
+    # Maximum number of ISSNs sent to a journal handler in one query; the query time
+    # grows faster than the batch, and 200 ISSNs stay well under the 30 s request timeout
+    _ISSN_BATCH_SIZE = 200
+    # Above this many batches, one scan of the catalogue is cheaper than the ISSN queries
+    _MAX_ISSN_BATCHES = 3
     
     def __init__(self):
         self._journalQuery: List[JournalQueryHandler] = []
         self._categoryQuery: List[CategoryQueryHandler] = []
+        # Identities of the registered handlers, for constant-time deduplication
+        self._journalQuerySet: Set[int] = set()
+        self._categoryQuerySet: Set[int] = set()
     
     def cleanJournalHandlers(self) -> bool:
         """
@@ -28,6 +65,7 @@ class BasicQueryEngine:
         """
         try:
             self._journalQuery.clear()
+            self._journalQuerySet.clear()
             return True
         except Exception:
             return False
@@ -41,6 +79,7 @@ class BasicQueryEngine:
         """
         try:
             self._categoryQuery.clear()
+            self._categoryQuerySet.clear()
             return True
         except Exception:
             return False
@@ -56,7 +95,8 @@ class BasicQueryEngine:
             bool: True if the addition succeeded
         """
         try:
-            if handler and handler not in self._journalQuery:
+            if handler and id(handler) not in self._journalQuerySet:
+                self._journalQuerySet.add(id(handler))
                 self._journalQuery.append(handler)
             return True
         except Exception:
@@ -73,12 +113,16 @@ class BasicQueryEngine:
             bool: True if the addition succeeded
         """
         try:
-            if handler and handler not in self._categoryQuery:
+            if handler and id(handler) not in self._categoryQuerySet:
+                # Drop ISSN indexes built before the handler was (re)attached
+                handler.clearIssnIndex()
+                self._categoryQuerySet.add(id(handler))
                 self._categoryQuery.append(handler)
             return True
         except Exception:
             return False
     
+    @_safe_query("searching for entity by ID", default=None)
     def getEntityById(self, entity_id: str) -> Optional[IdentifiableEntity]:
         """
         Return an entity by identifier.
@@ -89,29 +133,30 @@ class BasicQueryEngine:
         Returns:
             IdentifiableEntity or None: Found entity or None
         """
-        try:
-            # Search in journals
-            for handler in self._journalQuery:
-                df = handler.getById(entity_id)
-                if not df.empty:
-                    return self._dataframe_to_journal(df.iloc[0])
-            
-            # Search in categories
-            for handler in self._categoryQuery:
-                df = handler.getById(entity_id)
-                if not df.empty:
-                    row = df.iloc[0]
-                    if 'quartile' in row:
-                        return self._dataframe_to_category(row)
-                    else:
-                        return self._dataframe_to_area(row)
-            
-            return None
-            
-        except Exception as e:
-            print(f"Error while searching for entity by ID: {e}")
-            return None
+        # Search in journals
+        for handler in self._journalQuery:
+            if not handler.supportsId(entity_id):
+                continue
+            df = handler.getById(entity_id)
+            if not df.empty:
+                _, row = next(self._iter_rows(df.head(1), self._JOURNAL_COLUMNS))
+                return self._dataframe_to_journal(row)
+        
+        # Search in categories, skipping handlers that do not know the identifier
+        for handler in self._categoryQuery:
+            if not handler.supportsId(entity_id):
+                continue
+            df = handler.getById(entity_id)
+            if not df.empty:
+                _, row = next(self._iter_rows(df.head(1), ('id', 'quartile')))
+                if 'quartile' in df.columns:
+                    return self._dataframe_to_category(row)
+                else:
+                    return self._dataframe_to_area(row)
+        
+        return None
     
+    @_safe_query("fetching all journals")
     def getAllJournals(self) -> List[Journal]:
         """
         Return all journals.
@@ -119,19 +164,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of all journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getAllJournals()
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while fetching all journals: {e}")
-            return []
+        return self._merge_journals(handler.getAllJournals() for handler in self._journalQuery)
     
+    @_safe_query("searching journals by title")
     def getJournalsWithTitle(self, partialTitle: str) -> List[Journal]:
         """
         Return journals with partial title match.
@@ -142,19 +177,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithTitle(partialTitle)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals by title: {e}")
-            return []
+        return self._merge_journals(handler.getJournalsWithTitle(partialTitle) for handler in self._journalQuery)
     
+    @_safe_query("searching journals by publisher")
     def getJournalsPublishedBy(self, partialName: str) -> List[Journal]:
         """
         Return journals with partial publisher name match.
@@ -165,19 +190,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsPublishedBy(partialName)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals by publisher: {e}")
-            return []
+        return self._merge_journals(handler.getJournalsPublishedBy(partialName) for handler in self._journalQuery)
     
+    @_safe_query("searching journals by license")
     def getJournalsWithLicense(self, licenses: Set[str]) -> List[Journal]:
         """
         Return journals with specified licenses.
@@ -188,19 +203,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithLicense(licenses)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals by license: {e}")
-            return []
+        return self._merge_journals(handler.getJournalsWithLicense(licenses) for handler in self._journalQuery)
     
+    @_safe_query("searching journals with APC")
     def getJournalsWithAPC(self) -> List[Journal]:
         """
         Return journals that have Article Processing Charge (APC).
@@ -208,19 +213,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of journals with APC
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithAPC()
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals with APC: {e}")
-            return []
+        return self._merge_journals(handler.getJournalsWithAPC() for handler in self._journalQuery)
     
+    @_safe_query("searching journals with DOAJ Seal")
     def getJournalsWithDOAJSeal(self) -> List[Journal]:
         """
         Return journals that have DOAJ Seal.
@@ -228,19 +223,9 @@ class BasicQueryEngine:
         Returns:
             List[Journal]: List of journals with DOAJ Seal
         """
-        journal_map: Dict[str, Journal] = {}
-        
-        try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithDOAJSeal()
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals with DOAJ Seal: {e}")
-            return []
+        return self._merge_journals(handler.getJournalsWithDOAJSeal() for handler in self._journalQuery)
     
+    @_safe_query("fetching all categories")
     def getAllCategories(self) -> List[Category]:
         """
         Return all categories.
@@ -250,17 +235,13 @@ class BasicQueryEngine:
         """
         category_map: Dict[str, Category] = {}
         
-        try:
-            for handler in self._categoryQuery:
-                df = handler.getAllCategories()
-                self._collect_categories(df, category_map)
-            
-            return list(category_map.values())
-            
-        except Exception as e:
-            print(f"Error while fetching all categories: {e}")
-            return []
+        for handler in self._categoryQuery:
+            df = handler.getAllCategories()
+            self._collect_categories(df, category_map)
+        
+        return list(category_map.values())
     
+    @_safe_query("fetching all areas")
     def getAllAreas(self) -> List[Area]:
         """
         Return all areas.
@@ -270,17 +251,13 @@ class BasicQueryEngine:
         """
         area_map: Dict[str, Area] = {}
         
-        try:
-            for handler in self._categoryQuery:
-                df = handler.getAllAreas()
-                self._collect_areas(df, area_map)
-            
-            return list(area_map.values())
-            
-        except Exception as e:
-            print(f"Error while fetching all areas: {e}")
-            return []
+        for handler in self._categoryQuery:
+            df = handler.getAllAreas()
+            self._collect_areas(df, area_map)
+        
+        return list(area_map.values())
     
+    @_safe_query("searching categories by quartile")
     def getCategoriesWithQuartile(self, quartiles: Set[str]) -> List[Category]:
         """
         Return categories with specified quartiles.
@@ -293,17 +270,13 @@ class BasicQueryEngine:
         """
         category_map: Dict[str, Category] = {}
         
-        try:
-            for handler in self._categoryQuery:
-                df = handler.getCategoriesWithQuartile(quartiles)
-                self._collect_categories(df, category_map)
-            
-            return list(category_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching categories by quartile: {e}")
-            return []
+        for handler in self._categoryQuery:
+            df = handler.getCategoriesWithQuartile(quartiles)
+            self._collect_categories(df, category_map)
+        
+        return list(category_map.values())
     
+    @_safe_query("searching categories by areas")
     def getCategoriesAssignedToAreas(self, area_ids: Set[str]) -> List[Category]:
         """
         Return categories assigned to the specified areas.
@@ -316,17 +289,13 @@ class BasicQueryEngine:
         """
         category_map: Dict[str, Category] = {}
         
-        try:
-            for handler in self._categoryQuery:
-                df = handler.getCategoriesAssignedToAreas(area_ids)
-                self._collect_categories(df, category_map)
-            
-            return list(category_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching categories by areas: {e}")
-            return []
+        for handler in self._categoryQuery:
+            df = handler.getCategoriesAssignedToAreas(area_ids)
+            self._collect_categories(df, category_map)
+        
+        return list(category_map.values())
     
+    @_safe_query("searching areas by categories")
     def getAreasAssignedToCategories(self, category_ids: Set[str]) -> List[Area]:
         """
         Return areas assigned to the specified categories.
@@ -339,71 +308,186 @@ class BasicQueryEngine:
         """
         area_map: Dict[str, Area] = {}
         
-        try:
-            for handler in self._categoryQuery:
-                df = handler.getAreasAssignedToCategories(category_ids)
-                self._collect_areas(df, area_map)
-            
-            return list(area_map.values())
-            
-        except Exception as e:
-            print(f"Error while searching areas by categories: {e}")
-            return []
+        for handler in self._categoryQuery:
+            df = handler.getAreasAssignedToCategories(category_ids)
+            self._collect_areas(df, area_map)
+        
+        return list(area_map.values())
+
+    def _merge_journals(self, frames: Iterable) -> List[Journal]:
+        """Build deduplicated journals from the DataFrames returned by the handlers."""
+        return self._journals_from_store(self._merge_journal_frames(frames))
+
+    def _merge_journal_frames(self, frames: Iterable) -> pd.DataFrame:
+        """
+        Merge the DataFrames returned by the handlers into a columnar journal store.
+
+        Rows sharing a key (see _build_journal_keys) are merged with one groupby:
+        descriptive fields keep their first value, the seal and APC flags their
+        last one, and languages are accumulated in order of appearance. The store
+        has one row per journal, the _JOURNAL_FIELDS columns (None when missing)
+        and a `languages` column of tuples.
+        """
+        store_columns = self._JOURNAL_FIELDS + ('languages',)
+        frames = [df for df in frames if df is not None and not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=store_columns)
+        df = pd.concat(frames, ignore_index=True)
+        columns = self._clean_columns(df, self._JOURNAL_COLUMNS)
+        cleaned = pd.DataFrame(columns, index=df.index)
+        cleaned['key'] = self._build_journal_keys(df.index, columns)
+
+        languages: Dict[str, List[str]] = {}
+        if 'language' in cleaned.columns:
+            pairs = cleaned[['key', 'language']].dropna().drop_duplicates()
+            for key, language in zip(pairs['key'].to_numpy(), pairs['language'].to_numpy()):
+                languages.setdefault(key, []).append(language)
+
+        fields = [field for field in self._JOURNAL_FIELDS if field in cleaned.columns]
+        grouped = cleaned.groupby('key', sort=False).agg(
+            {field: 'last' if field in ('seal', 'apc') else 'first' for field in fields}
+        ) if fields else pd.DataFrame(index=pd.unique(cleaned['key']))
+        store = {field: self._store_values(grouped, field) for field in self._JOURNAL_FIELDS}
+        store['languages'] = [tuple(languages.get(key, ())) for key in grouped.index]
+        return pd.DataFrame(store, index=grouped.index, columns=store_columns)
+
+    def _journals_from_store(self, store: pd.DataFrame) -> List[Journal]:
+        """Convert the rows of a journal store (see _merge_journal_frames) to Journal objects."""
+        columns = {field: self._store_values(store, field) for field in self._JOURNAL_FIELDS}
+        journals: List[Journal] = []
+        for row, languages in zip(self._rows(columns, len(store)), store['languages']):
+            journal = self._dataframe_to_journal(row)
+            if journal:
+                journal.setLanguages(languages)
+                journals.append(journal)
+        return journals
 
-    def _collect_journals(self, df, target: Dict[str, Journal]) -> None:
-        """Merge journal rows into a deduplicated dictionary keyed by identifier."""
-        if df is None or df.empty:
-            return
-        for idx, row in df.iterrows():
-            key = self._get_journal_key(row, idx)
-            if not key:
-                continue
-            if key in target:
-                self._update_journal_from_row(target[key], row)
-            else:
-                journal = self._dataframe_to_journal(row)
-                if journal:
-                    target[key] = journal
+    @staticmethod
+    def _store_values(df, field: str) -> np.ndarray:
+        """Return a column as an object array with None for missing values."""
+        if field not in df.columns:
+            return np.full(len(df), None, dtype=object)
+        values = df[field].to_numpy(dtype=object, copy=True)
+        values[pd.isna(values)] = None
+        return values
+
+    @staticmethod
+    def _primary_ids(store: pd.DataFrame) -> pd.Series:
+        """Return the identifier each stored journal gets (ISSN, else EISSN)."""
+        return store['issn'].where(store['issn'].notna(), store['eissn'])
+
+    @staticmethod
+    def _bool_mask(column: pd.Series) -> np.ndarray:
+        """Vectorized counterpart of _to_bool for a store column of cleaned strings."""
+        return column.str.lower().isin(('1', 'true', 'yes')).to_numpy(dtype=bool)
 
     def _collect_categories(self, df, target: Dict[str, Category]) -> None:
-        """Collect categories without duplicates."""
+        """
+        Collect categories without duplicates.
+
+        Rows are first merged per identifier with a groupby (first non-null
+        quartile); the result is then merged into `target` with bulk dict
+        operations: known categories only gain a missing quartile.
+        """
         if df is None or df.empty:
             return
-        for idx, row in df.iterrows():
-            category = self._dataframe_to_category(row)
-            if not category:
-                continue
-            identifier = category.getIds()[0] if category.getIds() else f"__row_{idx}"
-            if identifier in target:
-                existing = target[identifier]
-                if not existing.getQuartile() and category.getQuartile():
-                    existing.setQuartile(category.getQuartile())
-            else:
-                target[identifier] = category
+        frame = pd.DataFrame(self._clean_columns(df, ('id', 'quartile')), index=df.index)
+        frame['key'] = self._entity_keys(df.index, frame)
+        merged = frame.groupby('key', sort=False).agg(
+            {column: 'first' for column in ('id', 'quartile') if column in frame.columns})
+        columns = {column: self._store_values(merged, column) for column in ('id', 'quartile')}
+        candidates = dict(zip(merged.index, map(self._dataframe_to_category, self._rows(columns, len(merged)))))
+
+        for identifier in candidates.keys() & target.keys():
+            existing, category = target[identifier], candidates[identifier]
+            if category and not existing.getQuartile() and category.getQuartile():
+                existing.setQuartile(category.getQuartile())
+        target.update({identifier: category for identifier, category in candidates.items()
+                       if category and identifier not in target})
 
     def _collect_areas(self, df, target: Dict[str, Area]) -> None:
-        """Collect areas without duplicates."""
+        """Collect areas without duplicates, merging them into `target` in bulk."""
         if df is None or df.empty:
             return
-        for idx, row in df.iterrows():
-            area = self._dataframe_to_area(row)
-            if not area:
-                continue
-            identifier = area.getIds()[0] if area.getIds() else f"__row_{idx}"
-            if identifier not in target:
-                target[identifier] = area
+        columns = self._clean_columns(df, ('id',))
+        keys = self._entity_keys(df.index, columns)
+        # Keep the first row of each identifier; areas already collected win over new ones
+        first = ~pd.Index(keys).duplicated()
+        columns = {column: values[first] for column, values in columns.items()}
+        candidates = dict(zip(keys[first], map(self._dataframe_to_area, self._rows(columns, int(first.sum())))))
+        target.update({identifier: area for identifier, area in candidates.items()
+                       if area and identifier not in target})
 
-    def _fetch_journals_by_issns(self, issns: Set[str]) -> List[Journal]:
-        """Fetch journals in batches by ISSN using the registered handlers."""
+    @staticmethod
+    def _entity_keys(index, columns) -> np.ndarray:
+        """Return the identifier of each category/area row, or a per-row placeholder if missing."""
+        keys = np.array([f"__row_{idx}" for idx in index], dtype=object)
+        if 'id' in columns:
+            ids = np.asarray(columns['id'], dtype=object)
+            valid = pd.notna(ids)
+            keys[valid] = ids[valid]
+        return keys
+
+    @classmethod
+    def _iter_rows(cls, df, columns: Iterable[str]) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Yield (index, row dict) pairs built from column arrays instead of per-row Series.
+
+        Only the requested columns present in the DataFrame appear in the rows;
+        their values are cleaned as described in _clean_column.
+        """
+        return zip(df.index, cls._rows(cls._clean_columns(df, columns), len(df)))
+
+    @staticmethod
+    def _rows(columns: Dict[str, np.ndarray], length: int) -> Iterator[Dict[str, Any]]:
+        """Yield one dict per row from a mapping of column arrays."""
+        names = list(columns)
+        values = zip(*columns.values()) if names else repeat((), length)
+        for row_values in values:
+            yield dict(zip(names, row_values))
+
+    @classmethod
+    def _clean_columns(cls, df, columns: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the cleaned arrays of the requested columns present in the DataFrame."""
+        return {column: cls._clean_column(df[column]) for column in columns if column in df.columns}
+
+    @staticmethod
+    def _clean_column(column) -> np.ndarray:
+        """
+        Return a column as an array of stripped strings, computed in one vectorized pass.
+
+        Cells without a meaningful value (None, nan, empty or blank) become None,
+        so the row converters only need a truthiness check.
+        """
+        stripped = column.astype('string').str.strip()
+        valid = (column.notna() & stripped.ne('').fillna(False)).to_numpy(dtype=bool)
+        values = stripped.to_numpy(dtype=object)
+        values[~valid] = None
+        return values
+
+    def _fetch_journals_by_issns(self, issns: Set[str], apc: Optional[bool] = None) -> List[Journal]:
+        """Fetch journals in batches by ISSN (optionally filtered on APC) using the registered handlers."""
         cleaned_ids = sorted({issn for issn in issns if issn})
         if not cleaned_ids:
             return []
-        journal_map: Dict[str, Journal] = {}
+        return self._merge_journals(self._journal_frames_by_issns(cleaned_ids, apc))
+
+    def _journal_frames_by_issns(self, issns: List[str], apc: Optional[bool] = None) -> Iterator:
+        """
+        Yield the handler DataFrames for the given ISSNs, batch by batch.
+
+        Batches are sent one at a time: concurrent batches slow the endpoint down
+        until they time out. A failed batch raises, so no partial result is merged.
+        When more than _MAX_ISSN_BATCHES batches would be needed, each handler
+        answers from one scan of its catalogue instead.
+        """
+        if len(issns) > self._ISSN_BATCH_SIZE * self._MAX_ISSN_BATCHES:
+            for handler in self._journalQuery:
+                yield handler.getJournalsByIssns(set(issns), apc, scan=True)
+            return
         for handler in self._journalQuery:
-            for chunk in self._chunked(cleaned_ids, 50):
-                df = handler.getJournalsByIssns(set(chunk))
-                self._collect_journals(df, journal_map)
-        return list(journal_map.values())
+            for chunk in self._chunked(issns, self._ISSN_BATCH_SIZE):
+                yield handler.getJournalsByIssns(set(chunk), apc)
 
     def _chunked(self, items: Iterable[str], size: int) -> Iterable[List[str]]:
         """Yield chunks of the input iterable with at most `size` elements."""
@@ -416,53 +500,22 @@ class BasicQueryEngine:
         if batch:
             yield batch
 
-    def _get_journal_key(self, row, idx: int) -> Optional[str]:
-        """Return a stable key for a journal row."""
-        for candidate in ('issn', 'eissn', 'journal'):
-            if candidate in row:
-                value = row.get(candidate)
-                if self._has_value(value):
-                    return str(value).strip()
-        return f"__row_{idx}"
-
-    def _update_journal_from_row(self, journal: Journal, row) -> None:
-        """Merge row data into an existing journal instance."""
-        if self._has_value(row.get('title')) and not journal.getTitle():
-            journal.setTitle(str(row.get('title')).strip())
-
-        language = row.get('language')
-        if self._has_value(language):
-            languages = journal.getLanguages()
-            lang_value = str(language).strip()
-            if lang_value not in languages:
-                languages.append(lang_value)
-                journal.setLanguages(languages)
-
-        if self._has_value(row.get('publisher')) and not journal.getPublisher():
-            journal.setPublisher(str(row.get('publisher')).strip())
-
-        seal_value = row.get('seal')
-        if self._has_value(seal_value):
-            journal.setSeal(self._to_bool(seal_value))
-
-        licence_value = row.get('licence')
-        if self._has_value(licence_value) and not journal.getLicence():
-            journal.setLicence(str(licence_value).strip())
-
-        apc_value = row.get('apc')
-        if self._has_value(apc_value):
-            journal.setAPC(self._to_bool(apc_value))
-
     @staticmethod
-    def _has_value(value) -> bool:
-        """Return True if the value is meaningful (not None/empty/nan)."""
-        if value is None:
-            return False
-        if isinstance(value, float) and math.isnan(value):
-            return False
-        if isinstance(value, str) and not value.strip():
-            return False
-        return True
+    def _build_journal_keys(index, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Return a stable key for every journal row, computed column by column.
+
+        The key is the first meaningful value among issn, eissn and journal,
+        falling back to the row index.
+        """
+        keys = np.array([f"__row_{idx}" for idx in index], dtype=object)
+        # Lowest priority first, so that later columns overwrite earlier ones
+        for candidate in ('journal', 'eissn', 'issn'):
+            if candidate in columns:
+                values = columns[candidate]
+                valid = pd.notna(values)
+                keys[valid] = values[valid]
+        return keys
 
     @staticmethod
     def _to_bool(value) -> bool:
@@ -475,10 +528,10 @@ class BasicQueryEngine:
     
     def _dataframe_to_journal(self, row) -> Optional[Journal]:
         """
-        Convert a DataFrame row to a Journal object.
+        Convert a cleaned row (see _iter_rows) to a Journal object.
 
         Args:
-            row: DataFrame row
+            row: Row dict with stripped strings or None
 
         Returns:
             Journal or None: Journal object or None
@@ -487,34 +540,24 @@ class BasicQueryEngine:
             journal = Journal()
             
             # Set identifier (ISSN)
-            issn = row.get('issn') if 'issn' in row else None
-            if not self._has_value(issn):
-                issn = row.get('eissn') if 'eissn' in row else None
-            if self._has_value(issn):
-                journal.setId(str(issn).strip())
+            issn = row.get('issn') or row.get('eissn')
+            if issn:
+                journal.setId(issn)
             
             # Set other fields
-            title_value = row.get('title')
-            journal.setTitle(str(title_value).strip() if self._has_value(title_value) else "")
+            journal.setTitle(row.get('title') or "")
             
-            # Languages (may be in different columns)
-            language_value = row.get('language') if 'language' in row else None
-            languages: List[str] = []
-            if self._has_value(language_value):
-                languages = [str(language_value).strip()]
-            journal.setLanguages(languages)
+            journal.addLanguage(row.get('language'))
             
-            publisher_value = row.get('publisher')
-            journal.setPublisher(str(publisher_value).strip() if self._has_value(publisher_value) else None)
+            journal.setPublisher(row.get('publisher'))
             
             seal_value = row.get('seal')
-            journal.setSeal(self._to_bool(seal_value) if self._has_value(seal_value) else False)
+            journal.setSeal(self._to_bool(seal_value) if seal_value else False)
             
-            licence_value = row.get('licence')
-            journal.setLicence(str(licence_value).strip() if self._has_value(licence_value) else "")
+            journal.setLicence(row.get('licence') or "")
             
             apc_value = row.get('apc')
-            journal.setAPC(self._to_bool(apc_value) if self._has_value(apc_value) else False)
+            journal.setAPC(self._to_bool(apc_value) if apc_value else False)
             
             return journal
             
@@ -524,20 +567,18 @@ class BasicQueryEngine:
     
     def _dataframe_to_category(self, row) -> Optional[Category]:
         """
-        Convert a DataFrame row to a Category object.
+        Convert a cleaned row (see _iter_rows) to a Category object.
 
         Args:
-            row: DataFrame row
+            row: Row dict with stripped strings or None
 
         Returns:
             Category or None: Category object or None
         """
         try:
             category = Category()
-            identifier = row.get('id')
-            category.setId(str(identifier).strip() if self._has_value(identifier) else "")
-            quartile = row.get('quartile')
-            category.setQuartile(str(quartile).strip() if self._has_value(quartile) else None)
+            category.setId(row.get('id') or "")
+            category.setQuartile(row.get('quartile'))
             return category
             
         except Exception as e:
@@ -546,18 +587,17 @@ class BasicQueryEngine:
     
     def _dataframe_to_area(self, row) -> Optional[Area]:
         """
-        Convert a DataFrame row to an Area object.
+        Convert a cleaned row (see _iter_rows) to an Area object.
 
         Args:
-            row: DataFrame row
+            row: Row dict with stripped strings or None
 
         Returns:
             Area or None: Area object or None
         """
         try:
             area = Area()
-            identifier = row.get('id')
-            area.setId(str(identifier).strip() if self._has_value(identifier) else "")
+            area.setId(row.get('id') or "")
             return area
             
         except Exception as e:
@@ -570,6 +610,28 @@ class FullQueryEngine(BasicQueryEngine):
     Extended query engine for performing complex mashup queries.
     """
     
+    def __init__(self):
+        super().__init__()
+        # Per-engine memoization of the ISSN lookups, keyed by (handler, database path, upload generation, ids)
+        self._category_issns_cache = lru_cache(maxsize=4096)(self._query_issns_in_categories)
+        self._area_issns_cache = lru_cache(maxsize=4096)(self._query_issns_for_areas)
+    
+    def cleanCategoryHandlers(self) -> bool:
+        """
+        Clear the list of category handlers and the cached ISSN lookups.
+
+        Returns:
+            bool: True if the clear succeeded
+        """
+        self.invalidateCaches()
+        return super().cleanCategoryHandlers()
+    
+    def invalidateCaches(self) -> None:
+        """Drop the memoized category and area ISSN lookups."""
+        self._category_issns_cache.cache_clear()
+        self._area_issns_cache.cache_clear()
+    
+    @_safe_query("searching journals in categories with quartile")
     def getJournalsInCategoriesWithQuartile(self, category_ids: Set[str], quartiles: Set[str]) -> List[Journal]:
         """
         Return journals in specified categories with given quartiles.
@@ -581,36 +643,12 @@ class FullQueryEngine(BasicQueryEngine):
         Returns:
             List[Journal]: List of found journals
         """
-        try:
-            # Get categories with specified quartiles
-            categories_with_quartile = self.getCategoriesWithQuartile(quartiles)
-            if not categories_with_quartile and quartiles:
-                return []
-            
-            # Filter by specified categories if provided
-            if category_ids:
-                categories_with_quartile = [cat for cat in categories_with_quartile 
-                                          if cat.getIds()[0] in category_ids]
-                if not categories_with_quartile:
-                    return []
-            
-            if not categories_with_quartile:
-                return []
-            
-            # Get ISSNs of journals from these categories
-            journal_issns: Set[str] = set()
-            for handler in self._categoryQuery:
-                for category in categories_with_quartile:
-                    category_id = category.getIds()[0]
-                    issns = self._get_issns_for_category(handler, category_id)
-                    journal_issns.update(issns)
-            
-            return self._fetch_journals_by_issns(journal_issns)
-            
-        except Exception as e:
-            print(f"Error while searching journals in categories with quartile: {e}")
-            return []
+        # Get ISSNs of journals in the specified categories with the specified quartiles
+        journal_issns = self._plan_categories_quartile_join(category_ids, quartiles)
+        
+        return self._fetch_journals_by_issns(journal_issns)
     
+    @_safe_query("searching journals in areas with license")
     def getJournalsInAreasWithLicense(self, area_ids: Set[str], licenses: Set[str]) -> List[Journal]:
         """
         Return journals in specified areas with given licenses.
@@ -622,36 +660,27 @@ class FullQueryEngine(BasicQueryEngine):
         Returns:
             List[Journal]: List of found journals
         """
-        try:
-            # Get journals with specified licenses
-            journals_with_license = self.getJournalsWithLicense(licenses)
-            
-            # Get ISSNs of journals in specified areas
-            journal_issns_in_areas: Optional[Set[str]] = set()
-            if area_ids:
-                for handler in self._categoryQuery:
-                    for area_id in area_ids:
-                        issns = self._get_issns_for_area(handler, area_id)
-                        journal_issns_in_areas.update(issns)
-            else:
-                journal_issns_in_areas = None
-            
-            # Filter journals by areas if needed
-            if journal_issns_in_areas is None:
-                return journals_with_license
-            
-            filtered: Dict[str, Journal] = {}
-            for journal in journals_with_license:
-                journal_issn = journal.getIds()[0] if journal.getIds() else None
-                if journal_issn and journal_issn in journal_issns_in_areas:
-                    filtered[journal_issn] = journal
-            
-            return list(filtered.values())
-            
-        except Exception as e:
-            print(f"Error while searching journals in areas with license: {e}")
-            return []
+        # Get journals with specified licenses, as a columnar store
+        journals_with_license = self._merge_journal_frames(
+            handler.getJournalsWithLicense(licenses) for handler in self._journalQuery)
+        
+        # Get ISSNs of journals in specified areas
+        journal_issns_in_areas: Optional[Set[str]] = set()
+        if area_ids:
+            for handler in self._categoryQuery:
+                issns = self._get_issns_for_areas(handler, area_ids)
+                journal_issns_in_areas.update(issns)
+        else:
+            journal_issns_in_areas = None
+        
+        # Filter journals by areas if needed
+        if journal_issns_in_areas is not None:
+            journal_issns = self._primary_ids(journals_with_license)
+            journals_with_license = journals_with_license[journal_issns.isin(journal_issns_in_areas).to_numpy()]
+        
+        return self._journals_from_store(journals_with_license)
     
+    @_safe_query("searching for diamond journals")
     def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, area_ids: Set[str], 
                                                           category_ids: Set[str], 
                                                           quartiles: Set[str]) -> List[Journal]:
@@ -666,98 +695,94 @@ class FullQueryEngine(BasicQueryEngine):
         Returns:
             List[Journal]: List of found journals
         """
-        try:
-            # Get journals without APC
-            journals_without_apc = [journal for journal in self.getAllJournals() if not journal.hasAPC()]
-            
-            # Get ISSNs of journals in specified areas
-            journal_issns_in_areas: Optional[Set[str]] = set()
-            if area_ids:
-                for handler in self._categoryQuery:
-                    for area_id in area_ids:
-                        issns = self._get_issns_for_area(handler, area_id)
-                        journal_issns_in_areas.update(issns)
-            else:
-                journal_issns_in_areas = None
-            
-            # Get ISSNs of journals in specified categories with quartiles
-            journal_issns_in_categories: Optional[Set[str]] = set()
-            categories_with_quartile = self.getCategoriesWithQuartile(quartiles)
-            if not categories_with_quartile and quartiles:
+        # Get ISSNs of journals in specified areas
+        journal_issns_in_areas: Optional[Set[str]] = set()
+        if area_ids:
+            for handler in self._categoryQuery:
+                issns = self._get_issns_for_areas(handler, area_ids)
+                journal_issns_in_areas.update(issns)
+        else:
+            journal_issns_in_areas = None
+        
+        # Get ISSNs of journals in specified categories with quartiles
+        journal_issns_in_categories: Optional[Set[str]] = self._plan_categories_quartile_join(
+            category_ids, quartiles)
+        if not journal_issns_in_categories:
+            if quartiles or category_ids:
                 return []
-            if category_ids:
-                categories_with_quartile = [cat for cat in categories_with_quartile 
-                                          if cat.getIds()[0] in category_ids]
-                if not categories_with_quartile:
-                    return []
-            
-            if categories_with_quartile:
-                for handler in self._categoryQuery:
-                    for category in categories_with_quartile:
-                        category_id = category.getIds()[0]
-                        issns = self._get_issns_for_category(handler, category_id)
-                        journal_issns_in_categories.update(issns)
-            else:
-                journal_issns_in_categories = None
-            
-            # Filter journals
-            filtered: Dict[str, Journal] = {}
-            for journal in journals_without_apc:
-                journal_issn = journal.getIds()[0] if journal.getIds() else None
-                if not journal_issn:
-                    continue
-                if journal_issns_in_areas is not None and journal_issn not in journal_issns_in_areas:
-                    continue
-                if journal_issns_in_categories is not None and journal_issn not in journal_issns_in_categories:
-                    continue
-                filtered[journal_issn] = journal
-            
-            return list(filtered.values())
-            
-        except Exception as e:
-            print(f"Error while searching for diamond journals: {e}")
-            return []
+            journal_issns_in_categories = None
+        
+        # Fetch only the candidate journals without APC (by ISSN, or one filtered scan for large
+        # candidate sets), or all of them when no filter applies
+        if journal_issns_in_areas is None and journal_issns_in_categories is None:
+            frames = (handler.getAllJournals() for handler in self._journalQuery)
+        else:
+            candidate_issns = journal_issns_in_areas if journal_issns_in_categories is None \
+                else journal_issns_in_categories if journal_issns_in_areas is None \
+                else journal_issns_in_areas & journal_issns_in_categories
+            frames = self._journal_frames_by_issns(sorted(issn for issn in candidate_issns if issn), apc=False)
+        journals = self._merge_journal_frames(frames)
+        
+        # Filter journals with column masks before building any Journal object
+        journal_issns = self._primary_ids(journals)
+        mask = journal_issns.notna().to_numpy() & ~self._bool_mask(journals['apc'])
+        if journal_issns_in_areas is not None:
+            mask &= journal_issns.isin(journal_issns_in_areas).to_numpy()
+        if journal_issns_in_categories is not None:
+            mask &= journal_issns.isin(journal_issns_in_categories).to_numpy()
+        
+        return self._journals_from_store(journals[mask])
     
-    def _get_issns_for_category(self, handler: CategoryQueryHandler, category_id: str) -> Set[str]:
+    def _plan_categories_quartile_join(self, category_ids: Set[str], quartiles: Set[str]) -> Set[str]:
         """
-        Get ISSNs of journals for the specified category.
+        Get ISSNs of journals in categories with the given quartiles, in one joined query per handler.
 
         Args:
-            handler (CategoryQueryHandler): Category handler
-            category_id (str): Category identifier
+            category_ids (Set[str]): Category identifiers to keep (all if empty)
+            quartiles (Set[str]): Set of quartiles (all if empty)
 
         Returns:
             Set[str]: Set of journal ISSNs
         """
-        try:
-            import sqlite3
-            conn = sqlite3.connect(handler.getDbPathOrUrl())
-            query = "SELECT DISTINCT issn FROM journal_categories WHERE category_id = ?"
-            cursor = conn.execute(query, (category_id,))
-            issns = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return issns
-        except Exception:
-            return set()
+        journal_issns: Set[str] = set()
+        for handler in self._categoryQuery:
+            try:
+                journal_issns.update(self._category_issns_cache(
+                    *self._cache_key(handler), frozenset(category_ids or ()), frozenset(quartiles or ())))
+            except Exception:
+                continue
+        return journal_issns
+    
+    @staticmethod
+    def _cache_key(handler: CategoryQueryHandler) -> Tuple[CategoryQueryHandler, str, int]:
+        """Return the handler part of a lookup cache key; a new upload to its database changes it."""
+        db_path = handler.getDbPathOrUrl()
+        return handler, db_path, CategoryQueryHandler._database_generation(db_path)
+    
+    @staticmethod
+    def _query_issns_in_categories(handler: CategoryQueryHandler, db_path: str, generation: int,
+                                   category_ids: FrozenSet[str], quartiles: FrozenSet[str]) -> FrozenSet[str]:
+        """Uncached body of the category lookup; `db_path` and `generation` only take part in the cache key."""
+        return frozenset(handler.getIssnsInCategoriesWithQuartile(category_ids, quartiles))
+    
+    @staticmethod
+    def _query_issns_for_areas(handler: CategoryQueryHandler, db_path: str, generation: int,
+                               area_ids: FrozenSet[str]) -> FrozenSet[str]:
+        """Uncached body of the area lookup; `db_path` and `generation` only take part in the cache key."""
+        return frozenset(handler.getIssnsForAreas(area_ids))
     
-    def _get_issns_for_area(self, handler: CategoryQueryHandler, area_id: str) -> Set[str]:
+    def _get_issns_for_areas(self, handler: CategoryQueryHandler, area_ids: Iterable[str]) -> Set[str]:
         """
-        Get ISSNs of journals for the specified area.
+        Get ISSNs of journals for the specified areas.
 
         Args:
             handler (CategoryQueryHandler): Category handler
-            area_id (str): Area identifier
+            area_ids (Iterable[str]): Area identifiers
 
         Returns:
             Set[str]: Set of journal ISSNs
         """
         try:
-            import sqlite3
-            conn = sqlite3.connect(handler.getDbPathOrUrl())
-            query = "SELECT DISTINCT issn FROM journal_areas WHERE area_id = ?"
-            cursor = conn.execute(query, (area_id,))
-            issns = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return issns
+            return self._area_issns_cache(*self._cache_key(handler), frozenset(area_ids))
         except Exception:
             return set()
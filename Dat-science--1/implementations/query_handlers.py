@@ -4,50 +4,210 @@ Query handlers for databases.
 Contains classes: JournalQueryHandler, CategoryQueryHandler
 """
 
-import requests
+import os
 import sqlite3
+import threading
+import time
 import pandas as pd
-from typing import List, Set, Optional
-from sqlite3 import connect
-from .handlers import QueryHandler
+from collections import OrderedDict
+from string import Template
+from typing import Dict, FrozenSet, Iterable, List, Set, Optional, Tuple
+from .handlers import QueryHandler, _SPARQL_LITERAL_ESCAPES, _create_session, _endpoint_generation
 from .models import Journal, Category, Area
 
 
+# =========================================================================
+# SPARQL templates, built once; query methods only substitute escaped values.
+# The most selective pattern of each query comes first.
+# =========================================================================
+
+_PREFIXES = (
+    "PREFIX doaj: <http://doaj.org/>\n"
+    "PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>\n"
+    "PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>\n"
+)
+_SELECT_JOURNAL = "SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc\n"
+
+_Q_BY_ID = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+{ ?journal doaj:issn "$id" } UNION { ?journal doaj:eissn "$id" }
+?journal rdf:type doaj:Journal .
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:title ?title }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}""")
+
+_Q_BY_IDS = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+VALUES ?wanted { $values }
+{ ?journal doaj:issn ?wanted } UNION { ?journal doaj:eissn ?wanted }
+?journal rdf:type doaj:Journal .
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:title ?title }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}""")
+
+_Q_ALL_JOURNALS = _PREFIXES + _SELECT_JOURNAL + """WHERE {
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}
+ORDER BY ?title"""
+
+# Title and publisher searches fall back to LCASE for journals uploaded without the
+# lowercased triples, so they cannot lead with doaj:titleLower / doaj:publisherLower
+_Q_WITH_TITLE = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+OPTIONAL { ?journal doaj:titleLower ?titleLower }
+FILTER (CONTAINS(COALESCE(?titleLower, LCASE(?title)), "$needle"))
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}
+ORDER BY ?title""")
+
+_Q_PUBLISHED_BY = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+?journal doaj:publisher ?publisher .
+OPTIONAL { ?journal doaj:publisherLower ?publisherLower }
+FILTER (CONTAINS(COALESCE(?publisherLower, LCASE(?publisher)), "$needle"))
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}
+ORDER BY ?title""")
+
+_Q_WITH_LICENSE = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+VALUES ?licence { $values }
+?journal doaj:licence ?licence .
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}
+ORDER BY ?title""")
+
+_Q_WITH_APC = _PREFIXES + _SELECT_JOURNAL + """WHERE {
+?journal doaj:hasAPC "true"^^xsd:boolean .
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+BIND ("true"^^xsd:boolean AS ?apc)
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+}
+ORDER BY ?title"""
+
+_Q_WITH_DOAJ_SEAL = _PREFIXES + _SELECT_JOURNAL + """WHERE {
+?journal doaj:hasDOAJSeal "true"^^xsd:boolean .
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+BIND ("true"^^xsd:boolean AS ?seal)
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+}
+ORDER BY ?title"""
+
+_Q_BY_ISSNS = Template(_PREFIXES + _SELECT_JOURNAL + """WHERE {
+VALUES ?wanted { $values }
+{ ?journal doaj:issn ?wanted } UNION { ?journal doaj:eissn ?wanted }
+?journal rdf:type doaj:Journal .
+?journal doaj:title ?title .
+OPTIONAL { ?journal doaj:issn ?issn }
+OPTIONAL { ?journal doaj:eissn ?eissn }
+OPTIONAL { ?journal doaj:language ?language }
+OPTIONAL { ?journal doaj:publisher ?publisher }
+OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
+OPTIONAL { ?journal doaj:licence ?licence }
+OPTIONAL { ?journal doaj:hasAPC ?apc }
+$apc_filter
+}
+ORDER BY ?title""")
+
+
 # =========================================================================
 # Ekaterina's part
 # =========================================================================
 
 class JournalQueryHandler(QueryHandler):   
 
+    # Query results kept per handler, and how long (seconds) each stays valid
+    _QUERY_CACHE_SIZE = 128
+    _QUERY_CACHE_TTL = 60.0
+
+    # Longest query text sent with GET; longer queries are sent as a form POST
+    _MAX_GET_QUERY_LENGTH = 2048
+
+    # Seconds to wait for a response; the catalogue query reads every journal and gets longer
+    _QUERY_TIMEOUT = 30
+    _CATALOGUE_TIMEOUT = 120
+
+    def __init__(self, dbPathOrUrl: str = ""):
+        super().__init__(dbPathOrUrl)
+        # Keep-alive session reused by every query sent to the endpoint
+        self._session = _create_session()
+        self._query_cache: "OrderedDict[str, Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._cache_generation = _endpoint_generation(dbPathOrUrl)
+        # Guards the cache, for handlers shared between threads
+        self._cache_lock = threading.RLock()
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        # Results cached for the previous endpoint do not apply to the new one
+        self.clearQueryCache()
+        self._cache_generation = _endpoint_generation(pathOrUrl)
+        return super().setDbPathOrUrl(pathOrUrl)
+
+    def clearQueryCache(self) -> None:
+
+        with self._cache_lock:
+            self._query_cache.clear()
+
     def _escape_literal(self, value: str) -> str:
 
         if value is None:
             return ""
             
-        return value.replace("\\", "\\\\").replace('"', '\\"')
+        return value.translate(_SPARQL_LITERAL_ESCAPES)
 
     def getById(self, entity_id: str) -> pd.DataFrame:
 
         try:
             escaped_id = self._escape_literal(entity_id)
-            sparql_query = f'''
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                FILTER (?issn = "{escaped_id}" || ?eissn = "{escaped_id}")
-                OPTIONAL {{ ?journal doaj:title ?title }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            '''
+            sparql_query = _Q_BY_ID.substitute(id=escaped_id)
 
             return self._execute_sparql_query(sparql_query)
 
@@ -69,25 +229,7 @@ class JournalQueryHandler(QueryHandler):
 
             values_string = " ".join(values_list)
 
-            sparql_query = f'''
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                VALUES ?wanted {{ {values_string} }}
-                FILTER (?issn = ?wanted || ?eissn = ?wanted)
-                OPTIONAL {{ ?journal doaj:title ?title }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            '''
+            sparql_query = _Q_BY_IDS.substitute(values=values_string)
 
             return self._execute_sparql_query(sparql_query)
 
@@ -98,26 +240,9 @@ class JournalQueryHandler(QueryHandler):
     def getAllJournals(self) -> pd.DataFrame:
  
         try:
-            sparql_query = '''
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                OPTIONAL { ?journal doaj:issn ?issn }
-                OPTIONAL { ?journal doaj:eissn ?eissn }
-                OPTIONAL { ?journal doaj:language ?language }
-                OPTIONAL { ?journal doaj:publisher ?publisher }
-                OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-                OPTIONAL { ?journal doaj:licence ?licence }
-                OPTIONAL { ?journal doaj:hasAPC ?apc }
-            }
-            ORDER BY ?title
-            '''
+            sparql_query = _Q_ALL_JOURNALS
 
-            return self._execute_sparql_query(sparql_query)
+            return self._execute_sparql_query(sparql_query, timeout=self._CATALOGUE_TIMEOUT)
 
         except Exception as e:
             print(f"Error in getAllJournals: {e}")
@@ -126,26 +251,10 @@ class JournalQueryHandler(QueryHandler):
     def getJournalsWithTitle(self, partialTitle: str) -> pd.DataFrame:
 
         try:
-            escaped_title = self._escape_literal(partialTitle)
-            sparql_query = f'''
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                FILTER (CONTAINS(LCASE(?title), LCASE("{escaped_title}")))
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            ORDER BY ?title
-            '''
+            # Lowercase the needle here; titles are stored lowercased as doaj:titleLower,
+            # or lowercased by the query for data loaded without it
+            escaped_title = self._escape_literal(partialTitle.lower())
+            sparql_query = _Q_WITH_TITLE.substitute(needle=escaped_title)
             
             return self._execute_sparql_query(sparql_query)
 
@@ -156,26 +265,10 @@ class JournalQueryHandler(QueryHandler):
     def getJournalsPublishedBy(self, partialName: str) -> pd.DataFrame:
 
         try:
-            escaped_name = self._escape_literal(partialName)
-            sparql_query = f'''
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                ?journal doaj:publisher ?publisher .
-                FILTER (CONTAINS(LCASE(?publisher), LCASE("{escaped_name}")))
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            ORDER BY ?title
-            '''
+            # Lowercase the needle here; publishers are stored lowercased as doaj:publisherLower,
+            # or lowercased by the query for data loaded without it
+            escaped_name = self._escape_literal(partialName.lower())
+            sparql_query = _Q_PUBLISHED_BY.substitute(needle=escaped_name)
 
             return self._execute_sparql_query(sparql_query)
 
@@ -194,37 +287,17 @@ class JournalQueryHandler(QueryHandler):
         if not licenses:
             return self.getAllJournals()
         
-        # Build the license filter
+        # Build the VALUES list of licenses
         escaped_licenses = [
-            f'"{self._escape_literal(license)}"' for license in licenses if license
+            f'"{self._escape_literal(license)}"' for license in sorted(l for l in licenses if l)
         ]
 
         if not escaped_licenses:
             return pd.DataFrame()
         
-        license_filter = " || ".join(
-            [f"?licence = {licence}" for licence in escaped_licenses]
-        )
+        values_string = " ".join(escaped_licenses)
 
-        sparql_query = f"""
-        PREFIX doaj: <http://doaj.org/>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-        SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-        WHERE {{
-            ?journal rdf:type doaj:Journal .
-            ?journal doaj:title ?title .
-            ?journal doaj:licence ?licence .
-            FILTER ({license_filter})
-            OPTIONAL {{ ?journal doaj:issn ?issn }}
-            OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-            OPTIONAL {{ ?journal doaj:language ?language }}
-            OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-            OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-            OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-        }}
-        ORDER BY ?title
-        """
+        sparql_query = _Q_WITH_LICENSE.substitute(values=values_string)
 
         return self._execute_sparql_query(sparql_query)
             
@@ -233,26 +306,7 @@ class JournalQueryHandler(QueryHandler):
 
     def getJournalsWithAPC(self) -> pd.DataFrame:
         
-        sparql_query = """
-        PREFIX doaj: <http://doaj.org/>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            
-        SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-        WHERE {
-            ?journal rdf:type doaj:Journal .
-            ?journal doaj:title ?title .
-            ?journal doaj:hasAPC "true"^^xsd:boolean .
-            OPTIONAL { ?journal doaj:issn ?issn }
-            OPTIONAL { ?journal doaj:eissn ?eissn }
-            OPTIONAL { ?journal doaj:language ?language }
-            OPTIONAL { ?journal doaj:publisher ?publisher }
-            OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-            OPTIONAL { ?journal doaj:licence ?licence }
-            OPTIONAL { ?journal doaj:hasAPC ?apc }
-        }
-        ORDER BY ?title
-        """
+        sparql_query = _Q_WITH_APC
 
         return self._execute_sparql_query(sparql_query)
 
@@ -261,103 +315,168 @@ class JournalQueryHandler(QueryHandler):
 
     def getJournalsWithDOAJSeal(self) -> pd.DataFrame:
         
-        sparql_query = """
-        PREFIX doaj: <http://doaj.org/>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            
-        SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-        WHERE {
-            ?journal rdf:type doaj:Journal .
-            ?journal doaj:title ?title .
-            ?journal doaj:hasDOAJSeal "true"^^xsd:boolean .
-            OPTIONAL { ?journal doaj:issn ?issn }
-            OPTIONAL { ?journal doaj:eissn ?eissn }
-            OPTIONAL { ?journal doaj:language ?language }
-            OPTIONAL { ?journal doaj:publisher ?publisher }
-            OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-            OPTIONAL { ?journal doaj:licence ?licence }
-            OPTIONAL { ?journal doaj:hasAPC ?apc }
-        }
-        ORDER BY ?title
-        """
+        sparql_query = _Q_WITH_DOAJ_SEAL
 
         return self._execute_sparql_query(sparql_query)
 
-    # Return journals that match any of the provided ISSNs or EISSNs
-    def getJournalsByIssns(self, issns: Set[str]) -> pd.DataFrame:
+    # Return journals that match any of the provided ISSNs or EISSNs,
+    # optionally restricted to journals with (apc=True) or without (apc=False) APC
+    def getJournalsByIssns(self, issns: Set[str], apc: Optional[bool] = None, scan: bool = False) -> pd.DataFrame:
         
         cleaned_ids = {issn for issn in issns if issn}
         if not cleaned_ids:
             return pd.DataFrame()
 
+        # For large ISSN sets one read of the catalogue, filtered here, is cheaper than the VALUES query
+        if scan:
+            journals = self._execute_sparql_query(_Q_ALL_JOURNALS, strict=True, timeout=self._CATALOGUE_TIMEOUT)
+            return self._filter_by_issns(journals, cleaned_ids, apc)
+
         values_clause = " ".join(
             f'"{self._escape_literal(issn)}"' for issn in sorted(cleaned_ids)
         )
+
+        # APC values may be typed booleans or plain "True"/"False" strings
+        apc_filter = ""
+        if apc is True:
+            apc_filter = 'FILTER (BOUND(?apc) && LCASE(STR(?apc)) IN ("true", "1", "yes"))'
+        elif apc is False:
+            apc_filter = 'FILTER (!BOUND(?apc) || LCASE(STR(?apc)) NOT IN ("true", "1", "yes"))'
         
-        sparql_query = f"""
-        PREFIX doaj: <http://doaj.org/>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-        SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-        WHERE {{
-            VALUES ?targetId {{ {values_clause} }}
-            ?journal rdf:type doaj:Journal .
-            ?journal doaj:title ?title .
-            OPTIONAL {{ ?journal doaj:issn ?issn }}
-            OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-            OPTIONAL {{ ?journal doaj:language ?language }}
-            OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-            OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-            OPTIONAL {{ ?journal doaj:licence ?licence }}
-            OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            BIND(COALESCE(?issn, ?eissn) AS ?anyId)
-            FILTER (?anyId IN ({values_clause}))
-        }}
-        ORDER BY ?title
-        """
-        return self._execute_sparql_query(sparql_query)
+        sparql_query = _Q_BY_ISSNS.substitute(values=values_clause, apc_filter=apc_filter)
+        # The engines query ISSNs in batches: a failed batch must not look like one without journals
+        return self._execute_sparql_query(sparql_query, strict=True)
     
 
     # =========================================================================
     # General method - Ekaterina
     # =========================================================================
     
-    def _execute_sparql_query(self, sparql_query: str) -> pd.DataFrame:
+    def _execute_sparql_query(self, sparql_query: str, strict: bool = False,
+                              timeout: Optional[float] = None) -> pd.DataFrame:
+
+        # Serve repeated queries from the cache until they expire or new data is pushed to the endpoint
+        generation = _endpoint_generation(self._dbPathOrUrl)
+        now = time.monotonic()
+        with self._cache_lock:
+            if generation != self._cache_generation:
+                self.clearQueryCache()
+                self._cache_generation = generation
+
+            cached = self._query_cache.get(sparql_query)
+            if cached is not None and now - cached[0] < self._QUERY_CACHE_TTL:
+                self._query_cache.move_to_end(sparql_query)
+                return cached[1].copy()
+
+        # The request itself runs outside the lock, so concurrent queries overlap
+        # A failed request yields an empty DataFrame, or raises when the caller asks to be told
+        result = self._fetch_sparql_query(sparql_query, timeout or self._QUERY_TIMEOUT)
+        if result is None:
+            if strict:
+                raise RuntimeError(f"SPARQL query to {self._dbPathOrUrl} failed")
+            return pd.DataFrame()
+
+        with self._cache_lock:
+            self._query_cache[sparql_query] = (now, result)
+            self._query_cache.move_to_end(sparql_query)
+            while len(self._query_cache) > self._QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return result.copy()
+
+    def _fetch_sparql_query(self, sparql_query: str, timeout: float) -> Optional[pd.DataFrame]:
 
         #Execute SPARQL query using direct HTTP request. Alternative to sparql_dataframe library for more control.
+        #Return None when the request fails so that failures are not cached.
       
         try:
-            response = requests.get(
-                self._dbPathOrUrl,
-                params={"query": sparql_query, "format": "json"},
-                timeout=30,
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                bindings = data.get("results", {}).get("bindings", [])
-
-                if not bindings:
-                    return pd.DataFrame()
-
-                # Transformation to dataframe
-                rows = []
-                for binding in bindings:
-                    row = {}
-                    for key, value in binding.items():
-                        row[key] = value.get("value", "")
-                    rows.append(row)
-
-                return pd.DataFrame(rows)
-            else:
-                print(f"SPARQL query failed with status: {response.status_code}")
-                return pd.DataFrame()
+            # Ask for CSV results; fall back to JSON if the endpoint refuses CSV
+            response = self._send_query({"query": sparql_query}, "text/csv", timeout)
+            if response.status_code == 406:
+                response.close()
+                response = self._send_query(
+                    {"query": sparql_query, "format": "json"},
+                    "application/sparql-results+json",
+                    timeout,
+                )
+
+            with response:
+                if response.status_code == 200:
+                    if "csv" in response.headers.get("Content-Type", ""):
+                        # Parse the body while it is still arriving instead of buffering it first
+                        response.raw.decode_content = True
+                        return self._csv_to_dataframe(response.raw)
+                    return self._json_to_dataframe(response.json())
+                else:
+                    print(f"SPARQL query failed with status: {response.status_code}")
+                    return None
 
         except Exception as e:
             print(f"Error in _execute_sparql_query: {e}")
+            return None
+
+    def _send_query(self, params: Dict[str, str], accept: str, timeout: float):
+
+        # Short queries stay GET (cacheable); long ones, e.g. big VALUES lists, are POSTed to avoid URL limits.
+        # Responses are streamed; the caller reads the body and closes them
+        headers = {"Accept": accept}
+        if len(params["query"]) <= self._MAX_GET_QUERY_LENGTH:
+            return self._session.get(self._dbPathOrUrl, params=params, headers=headers, timeout=timeout, stream=True)
+        return self._session.post(self._dbPathOrUrl, data=params, headers=headers, timeout=timeout, stream=True)
+
+    @staticmethod
+    def _filter_by_issns(journals: pd.DataFrame, issns: Set[str], apc: Optional[bool]) -> pd.DataFrame:
+
+        # Same rows as the ISSN query: issn or eissn among `issns`, APC flag as requested
+        if journals.empty:
+            return journals
+        mask = pd.Series(False, index=journals.index)
+        for column in ("issn", "eissn"):
+            if column in journals.columns:
+                mask |= journals[column].isin(issns)
+        if apc is not None:
+            has_apc = journals["apc"].astype(str).str.lower().isin(("true", "1", "yes")) \
+                if "apc" in journals.columns else pd.Series(False, index=journals.index)
+            mask &= has_apc if apc else ~has_apc
+        return journals[mask].reset_index(drop=True)
+
+    @staticmethod
+    def _csv_to_dataframe(source) -> pd.DataFrame:
+
+        # Empty CSV cells are unbound variables; every other value is kept as text
+        df = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[""])
+        if df.empty:
             return pd.DataFrame()
 
+        # Variables never bound do not become columns
+        return df.dropna(axis=1, how="all")
+
+    @staticmethod
+    def _json_to_dataframe(data: dict) -> pd.DataFrame:
+
+        bindings = data.get("results", {}).get("bindings", [])
+
+        if not bindings:
+            return pd.DataFrame()
+
+        # Transformation to dataframe: one pre-sized list per variable (None where unbound),
+        # filled in place from each binding
+        size = len(bindings)
+        columns = {var: [None] * size for var in data.get("head", {}).get("vars", [])}
+        bound = set()
+        for i, binding in enumerate(bindings):
+            for key, value in binding.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * size
+                column[i] = value.get("value", "")
+                bound.add(key)
+
+        # Variables never bound do not become columns
+        return pd.DataFrame(
+            {var: column for var, column in columns.items() if var in bound},
+            copy=False,
+        )
+
 
 # =============================================================================
 #  part of Arina S.
@@ -367,111 +486,241 @@ class JournalQueryHandler(QueryHandler):
 
 class CategoryQueryHandler(QueryHandler):
 
+    # Maximum number of ids bound in one IN clause
+    _IN_BATCH_SIZE = 500
+
+    def __init__(self, dbPathOrUrl: str = ""):
+        super().__init__(dbPathOrUrl)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._area_issns: Optional[Dict[str, FrozenSet[str]]] = None
+        self._entity_ids: Optional[FrozenSet[str]] = None
+        self._upload_generation = self._database_generation(dbPathOrUrl)
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        # A new path invalidates the cached connection and ISSN index
+        self.closeConnection()
+        self.clearIssnIndex()
+        self._upload_generation = self._database_generation(pathOrUrl)
+        return super().setDbPathOrUrl(pathOrUrl)
+
+    # Return how many times data has been uploaded to the database file in this process
+
+    @staticmethod
+    def _database_generation(path: str) -> int:
+
+        return _endpoint_generation(os.path.abspath(path))
+
+    # Drop the in-memory index and id set if data was uploaded to the database since they were built
+
+    def _check_upload_generation(self) -> None:
+
+        generation = self._database_generation(self._dbPathOrUrl)
+        if generation != self._upload_generation:
+            self.clearIssnIndex()
+            self._upload_generation = generation
+
+    # Return the cached connection to the database, opening it on first use
+
+    def getConnection(self) -> sqlite3.Connection:
+
+        if self._conn is None:
+            # Room for the prepared statement of every query text (one per IN-list size) the handler issues
+            self._conn = sqlite3.connect(self._dbPathOrUrl, check_same_thread=False, cached_statements=256)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute("PRAGMA cache_size=-65536")
+            self._conn.execute("PRAGMA mmap_size=268435456")
+        return self._conn
+
+    def closeConnection(self) -> None:
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # Build the in-memory area -> ISSNs index with one scan of the link table
+
+    def buildIssnIndex(self) -> None:
+
+        self._area_issns = self._group_issns(
+            self.getConnection().execute("SELECT area_id, issn FROM journal_areas"))
+
+    def clearIssnIndex(self) -> None:
+
+        self._area_issns = None
+        self._entity_ids = None
+
+    # Tell whether a category or an area with this identifier exists, from an in-memory id set
+
+    def supportsId(self, entity_id: str) -> bool:
+
+        self._check_upload_generation()
+        if self._entity_ids is None:
+            rows = self.getConnection().execute("SELECT id FROM categories UNION SELECT id FROM areas")
+            self._entity_ids = frozenset(row[0] for row in rows)
+        return entity_id in self._entity_ids
+
+    # Return ISSNs of journals in any of the specified areas
+
+    def getIssnsForAreas(self, area_ids: Iterable[str]) -> Set[str]:
+
+        self._check_upload_generation()
+        if self._area_issns is None:
+            self.buildIssnIndex()
+        return self._union_issns(self._area_issns, area_ids)
+
+    # Return ISSNs of journals in the specified categories (all if empty) whose
+    # category quartile is one of the specified quartiles (any if empty)
+
+    def getIssnsInCategoriesWithQuartile(self, category_ids: Set[str], quartiles: Set[str]) -> Set[str]:
+
+        quartile_clause = ""
+        quartile_params: List[str] = []
+        if quartiles:
+            quartile_clause = f"c.quartile IN ({','.join('?' for _ in quartiles)})"
+            quartile_params = list(quartiles)
+
+        # Category ids are bound in batches, keeping each query below SQLite's variable limit
+        ids = sorted(category_ids) if category_ids else []
+        batches = [ids[i:i + self._IN_BATCH_SIZE] for i in range(0, len(ids), self._IN_BATCH_SIZE)] or [[]]
+
+        conn = self.getConnection()
+        issns: Set[str] = set()
+        for batch in batches:
+            conditions = []
+            if batch:
+                conditions.append(f"c.id IN ({','.join('?' for _ in batch)})")
+            if quartile_clause:
+                conditions.append(quartile_clause)
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            query = f"""
+            SELECT DISTINCT jc.issn
+            FROM journal_categories jc
+            JOIN categories c ON c.id = jc.category_id
+            {where_clause}
+            """
+            issns.update(row[0] for row in conn.execute(query, batch + quartile_params))
+        return issns
+
+    @staticmethod
+    def _group_issns(rows) -> Dict[str, FrozenSet[str]]:
+        grouped: Dict[str, Set[str]] = {}
+        for key, issn in rows:
+            grouped.setdefault(key, set()).add(issn)
+        return {key: frozenset(issns) for key, issns in grouped.items()}
+
+    @staticmethod
+    def _union_issns(index: Dict[str, FrozenSet[str]], ids: Iterable[str]) -> Set[str]:
+        issns: Set[str] = set()
+        for entity_id in ids:
+            issns.update(index.get(entity_id, ()))
+        return issns
+
     def getById(self, entity_id: str) -> pd.DataFrame:
         
-        with connect(self._dbPathOrUrl) as conn:
+        conn = self.getConnection()
 
-            category_query = "SELECT id, quartile FROM categories WHERE id = ?"
-            category_df = pd.read_sql_query(category_query, conn, params=(entity_id,))
+        category_query = "SELECT id, quartile FROM categories WHERE id = ?"
+        category_df = pd.read_sql_query(category_query, conn, params=(entity_id,))
 
-            if not category_df.empty:
-                return category_df
+        if not category_df.empty:
+            return category_df
 
-            area_query = "SELECT id FROM areas WHERE id = ?"
-            area_df = pd.read_sql_query(area_query, conn, params=(entity_id,))
-            return area_df
+        area_query = "SELECT id FROM areas WHERE id = ?"
+        area_df = pd.read_sql_query(area_query, conn, params=(entity_id,))
+        return area_df
 
         
     # Return all categories from the database 
     
     def getAllCategories(self) -> pd.DataFrame:
         
-        with connect(self._dbPathOrUrl) as conn:
+        conn = self.getConnection()
 
-            query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
-            df = pd.read_sql_query(query, conn)
-            return df
+        query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
+        df = pd.read_sql_query(query, conn)
+        return df
 
     # Return all areas from the database
     
     def getAllAreas(self) -> pd.DataFrame:
         
-        with connect(self._dbPathOrUrl) as conn:
+        conn = self.getConnection()
 
-            query = "SELECT DISTINCT id FROM areas ORDER BY id"
-            df = pd.read_sql_query(query, conn)
-            return df
+        query = "SELECT DISTINCT id FROM areas ORDER BY id"
+        df = pd.read_sql_query(query, conn)
+        return df
 
 
     # Return categories with specified quartiles
     
     def getCategoriesWithQuartile(self, quartiles: Set[str]) -> pd.DataFrame:
       
-        with connect(self._dbPathOrUrl) as conn:
+        conn = self.getConnection()
 
-            if not quartiles:
-                # If quartiles are not specified, return all categories
-                query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Building query with quartile filter
-                placeholders = ",".join(["?" for _ in quartiles])
-                query = f"SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
-                df = pd.read_sql_query(query, conn, params=list(quartiles))
+        if not quartiles:
+            # If quartiles are not specified, return all categories
+            query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
+            df = pd.read_sql_query(query, conn)
+        else:
+            # Building query with quartile filter
+            placeholders = ",".join(["?" for _ in quartiles])
+            query = f"SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
+            df = pd.read_sql_query(query, conn, params=list(quartiles))
 
-            return df
+        return df
 
 
     # Return categories assigned to specified areas
     
     def getCategoriesAssignedToAreas(self, area_ids: Set[str]) -> pd.DataFrame:
         
-        with connect(self._dbPathOrUrl) as conn:
-
-            if not area_ids:
-                # If areas are not specified, return all categories
-                query = """
-                SELECT DISTINCT c.id, c.quartile 
-                FROM categories c 
-                ORDER BY c.id
-                """
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Build query with area filter
-                placeholders = ",".join(["?" for _ in area_ids])
-                query = f"""
-                SELECT DISTINCT c.id, c.quartile 
-                FROM categories c
-                JOIN journal_categories jc ON c.id = jc.category_id
-                JOIN journal_areas ja ON jc.issn = ja.issn
-                WHERE ja.area_id IN ({placeholders})
-                ORDER BY c.id
-                """
-                df = pd.read_sql_query(query, conn, params=list(area_ids))
-
-            return df
+        conn = self.getConnection()
+
+        if not area_ids:
+            # If areas are not specified, return all categories
+            query = """
+            SELECT DISTINCT c.id, c.quartile 
+            FROM categories c 
+            ORDER BY c.id
+            """
+            df = pd.read_sql_query(query, conn)
+        else:
+            # Build query with area filter
+            placeholders = ",".join(["?" for _ in area_ids])
+            query = f"""
+            SELECT DISTINCT c.id, c.quartile 
+            FROM categories c
+            JOIN journal_categories jc ON c.id = jc.category_id
+            JOIN journal_areas ja ON jc.issn = ja.issn
+            WHERE ja.area_id IN ({placeholders})
+            ORDER BY c.id
+            """
+            df = pd.read_sql_query(query, conn, params=list(area_ids))
+
+        return df
 
     # Return areas assigned to specified categories
 
     def getAreasAssignedToCategories(self, category_ids: Set[str]) -> pd.DataFrame:
         
-        with connect(self._dbPathOrUrl) as conn:
-
-            if not category_ids:
-                # If categories are not specified, return all areas
-                query = "SELECT DISTINCT id FROM areas ORDER BY id"
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Build query with category filter
-                placeholders = ",".join(["?" for _ in category_ids])
-                query = f"""
-                SELECT DISTINCT a.id 
-                FROM areas a
-                JOIN journal_areas ja ON a.id = ja.area_id
-                JOIN journal_categories jc ON ja.issn = jc.issn
-                WHERE jc.category_id IN ({placeholders})
-                ORDER BY a.id
-                """
-                df = pd.read_sql_query(query, conn, params=list(category_ids))
-
-            return df
+        conn = self.getConnection()
+
+        if not category_ids:
+            # If categories are not specified, return all areas
+            query = "SELECT DISTINCT id FROM areas ORDER BY id"
+            df = pd.read_sql_query(query, conn)
+        else:
+            # Build query with category filter
+            placeholders = ",".join(["?" for _ in category_ids])
+            query = f"""
+            SELECT DISTINCT a.id 
+            FROM areas a
+            JOIN journal_areas ja ON a.id = ja.area_id
+            JOIN journal_categories jc ON ja.issn = jc.issn
+            WHERE jc.category_id IN ({placeholders})
+            ORDER BY a.id
+            """
+            df = pd.read_sql_query(query, conn, params=list(category_ids))
+
+        return df
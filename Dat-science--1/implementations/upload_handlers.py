@@ -1,12 +1,36 @@
-import csv
 import json
+import os
 import sqlite3
-import requests
-from typing import List, Dict, Any
-from .handlers import UploadHandler
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Iterator
+from .handlers import UploadHandler, _SPARQL_LITERAL_ESCAPES, _bump_endpoint_generation, _create_session
 
 
 class JournalUploadHandler(UploadHandler):
+
+    # Number of journals sent in each INSERT DATA request
+    _UPLOAD_BATCH_SIZE = 500
+    # Number of batches sent concurrently
+    _UPLOAD_WORKERS = 8
+
+    # DOAJ CSV columns read by the upload, and the journal fields they fill
+    _CSV_COLUMNS = {
+        'Journal title': 'title',
+        'Journal ISSN (print version)': 'issn_print',
+        'Journal EISSN (online version)': 'eissn',
+        'Languages in which the journal accepts manuscripts': 'languages',
+        'Publisher': 'publisher',
+        'DOAJ Seal': 'seal',
+        'Journal license': 'licence',
+        'APC': 'apc',
+    }
+
+    def __init__(self, dbPathOrUrl: str = ""):
+        super().__init__(dbPathOrUrl)
+        # Keep-alive session reused by every update sent to the endpoint
+        self._session = _create_session()
     
     def pushDataToDb(self, path: str) -> bool:
         
@@ -21,44 +45,48 @@ class JournalUploadHandler(UploadHandler):
     
     def _read_csv_file(self, path: str) -> List[Dict[str, Any]]:
         
-        journals = []
-        
-        with open(path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                journal_data = {
-                    'title': row['Journal title'],
-                    'issn_print': row['Journal ISSN (print version)'],
-                    'eissn': row['Journal EISSN (online version)'],
-                    'languages': [lang for lang in row['Languages in which the journal accepts manuscripts'].split(', ')],
-                    'publisher': row['Publisher'] if row['Publisher'] else None,
-                    'seal': row['DOAJ Seal'] == 'Yes',
-                    'licence': row['Journal license'],
-                    'apc': row['APC'] == 'Yes'
-                }
-                journals.append(journal_data)
+        # Parse the CSV in C and convert whole columns at once; every cell is read as text
+        df = pd.read_csv(
+            path,
+            usecols=list(self._CSV_COLUMNS),
+            dtype=object,
+            keep_default_na=False,
+            encoding='utf-8',
+        ).rename(columns=self._CSV_COLUMNS)
+
+        df['languages'] = df['languages'].str.split(', ')
+        df['publisher'] = df['publisher'].where(df['publisher'] != '', None)
+        df['seal'] = df['seal'].eq('Yes')
+        df['apc'] = df['apc'].eq('Yes')
 
-        return journals
+        # One dict per journal, assembled from plain column lists
+        fields = list(self._CSV_COLUMNS.values())
+        columns = [df[field].tolist() for field in fields]
+        return [dict(zip(fields, values)) for values in zip(*columns)]
     
     def _upload_to_blazegraph(self, journals_data: List[Dict[str, Any]]) -> bool:
         
         success_count = 0
         
-        for journal in journals_data:
-            sparql_query = self._build_single_journal_query(journal)
-            
-            response = requests.post(
-                self._dbPathOrUrl,
-                data={'update': sparql_query},
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
-            
-            if response.status_code == 200:
-                success_count += 1
+        # One INSERT DATA update per batch instead of one request per journal,
+        # with several batches in flight at once over the pooled session
+        batches = [
+            journals_data[start:start + self._UPLOAD_BATCH_SIZE]
+            for start in range(0, len(journals_data), self._UPLOAD_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=self._UPLOAD_WORKERS) as executor:
+            status_codes = list(executor.map(self._post_batch, batches))
+        
+        start = 0
+        for batch, status_code in zip(batches, status_codes):
+            if status_code == 200:
+                success_count += len(batch)
             else:
-                print(f"Error loading journal {journal.get('issn_print', 'unknown')}: {response.status_code}")
+                print(f"Error loading journals {start + 1}-{start + len(batch)}: {status_code}")
+            start += len(batch)
         
         if success_count > 0:
+            _bump_endpoint_generation(self._dbPathOrUrl)
             print(f"Successfully loaded {success_count} out of {len(journals_data)} journals into Blazegraph")
             return True
         else:
@@ -66,6 +94,15 @@ class JournalUploadHandler(UploadHandler):
             return False
                 
     
+    def _post_batch(self, batch: List[Dict[str, Any]]) -> int:
+        # Send one batch as an INSERT DATA update and return the HTTP status
+        response = self._session.post(
+            self._dbPathOrUrl,
+            data={'update': self._build_insert_query(batch)},
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+        return response.status_code
+    
     def _build_insert_query(self, journals_data: List[Dict[str, Any]]) -> str:
         # Defining prefixes
         prefixes = """
@@ -89,6 +126,8 @@ class JournalUploadHandler(UploadHandler):
             # Add triplets for the journal
             insert_data += f"    {journal_uri} rdf:type doaj:Journal .\n"
             insert_data += f"    {journal_uri} doaj:title \"{self._escape_string(journal['title'])}\" .\n"
+            # Lowercased copy used by case-insensitive title searches
+            insert_data += f"    {journal_uri} doaj:titleLower \"{self._escape_string(journal['title'].lower())}\" .\n"
             
             if journal['issn_print']:
                 insert_data += f"    {journal_uri} doaj:issn \"{journal['issn_print']}\" .\n"
@@ -102,99 +141,113 @@ class JournalUploadHandler(UploadHandler):
             # Publisher
             if journal['publisher']:
                 insert_data += f"    {journal_uri} doaj:publisher \"{self._escape_string(journal['publisher'])}\" .\n"
+                insert_data += f"    {journal_uri} doaj:publisherLower \"{self._escape_string(journal['publisher'].lower())}\" .\n"
             
             # DOAJ Seal
-            insert_data += f"    {journal_uri} doaj:hasDOAJSeal \"{journal['seal']}\"^^xsd:boolean .\n"
+            insert_data += f"    {journal_uri} doaj:hasDOAJSeal \"{str(journal['seal']).lower()}\"^^xsd:boolean .\n"
             
             # License
             insert_data += f"    {journal_uri} doaj:licence \"{self._escape_string(journal['licence'])}\" .\n"
             
             # APC
-            insert_data += f"    {journal_uri} doaj:hasAPC \"{journal['apc']}\"^^xsd:boolean .\n"
-        
-        insert_data += "}"
-        
-        return prefixes + insert_data
-    
-    def _build_single_journal_query(self, journal: Dict[str, Any]) -> str:
-        # Defining prefixes
-        prefixes = """
-        PREFIX doaj: <http://doaj.org/>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        """
-        
-        # We use ISSN as a journal identifier
-        journal_id = journal['issn_print'] or journal['eissn']
-        if not journal_id:
-            return ""
-            
-        journal_uri = f"<http://doaj.org/journal/{journal_id}>"
-        
-        # Forming the INSERT DATA block
-        insert_data = f"INSERT DATA {{\n"
-        insert_data += f"    {journal_uri} rdf:type doaj:Journal .\n"
-        insert_data += f"    {journal_uri} doaj:title \"{self._escape_string(journal['title'])}\" .\n"
-        
-        if journal['issn_print']:
-            insert_data += f"    {journal_uri} doaj:issn \"{journal['issn_print']}\" .\n"
-        if journal['eissn']:
-            insert_data += f"    {journal_uri} doaj:eissn \"{journal['eissn']}\" .\n"
-        
-        # Languages
-        for lang in journal['languages']:
-            insert_data += f"    {journal_uri} doaj:language \"{self._escape_string(lang)}\" .\n"
-        
-        # Publisher
-        if journal['publisher']:
-            insert_data += f"    {journal_uri} doaj:publisher \"{self._escape_string(journal['publisher'])}\" .\n"
-        
-        # DOAJ Seal
-        insert_data += f"    {journal_uri} doaj:hasDOAJSeal \"{journal['seal']}\" .\n"
-        
-        # License
-        insert_data += f"    {journal_uri} doaj:licence \"{self._escape_string(journal['licence'])}\" .\n"
-        
-        # APC
-        insert_data += f"    {journal_uri} doaj:hasAPC \"{journal['apc']}\" .\n"
+            insert_data += f"    {journal_uri} doaj:hasAPC \"{str(journal['apc']).lower()}\"^^xsd:boolean .\n"
         
         insert_data += "}"
         
         return prefixes + insert_data
     
     def _escape_string(self, text: str) -> str:
-        return text.replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+        return text.translate(_SPARQL_LITERAL_ESCAPES)
 
 
 class CategoryUploadHandler(UploadHandler):
+
+    # Number of SCImago entries whose rows are inserted together
+    _INSERT_BATCH_SIZE = 5000
+
+    # Characters read from the JSON file at a time
+    _READ_CHUNK_SIZE = 1 << 16
     
     def pushDataToDb(self, path: str) -> bool:
         
-        # Reading a JSON file
+        # Reading a JSON file, entry by entry
         scimago_data = self._read_json_file(path)
-        if not scimago_data:
+        first_entry = next(scimago_data, None)
+        if first_entry is None:
             print(f"Error: Unable to read file {path}")
             return False
         
         # Creating tables and loading data
-        return self._upload_to_sqlite(scimago_data)
+        return self._upload_to_sqlite(chain([first_entry], scimago_data))
     
-    def _read_json_file(self, path: str) -> List[Dict[str, Any]]:
+    def _read_json_file(self, path: str) -> Iterator[Dict[str, Any]]:
+        # Yield the items of the top-level JSON array without loading the whole file
+        decoder = json.JSONDecoder()
         with open(path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data
+            buffer = ''
+            while not buffer.strip():
+                chunk = file.read(self._READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+            buffer = buffer.lstrip()
+            if not buffer.startswith('['):
+                raise ValueError(f"{path} does not contain a JSON array")
+            pos = 1
+            eof = False
+
+            while True:
+                # Skip whitespace and separators up to the next item
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == ']':
+                    return
+
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # The item is complete only once the separator after it has been read:
+                    # a number cut by the buffer end (e.g. "4.5e") still decodes, as a shorter one
+                    after = end
+                    while after < len(buffer) and buffer[after] in ' \t\r\n':
+                        after += 1
+                    if after < len(buffer) and buffer[after] in ',]':
+                        yield item
+                        pos = after
+                        continue
+                    if eof:
+                        raise json.JSONDecodeError("Expecting ',' delimiter", buffer, after)
+
+                chunk = file.read(self._READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
     
-    def _upload_to_sqlite(self, scimago_data: List[Dict[str, Any]]) -> bool:
+    def _upload_to_sqlite(self, scimago_data: Iterable[Dict[str, Any]]) -> bool:
         conn = sqlite3.connect(self._dbPathOrUrl)
         cursor = conn.cursor()
+
+        # Bulk load settings: rollback journal kept in memory, no fsync per write
+        cursor.execute('PRAGMA journal_mode=MEMORY')
+        cursor.execute('PRAGMA synchronous=OFF')
         
         # Creating tables
         self._create_tables(cursor)
         
-        # Loading data
+        # Loading data in a single transaction
+        cursor.execute('BEGIN')
         self._insert_data(cursor, scimago_data)
+
+        # Indexes are built once after the load rather than maintained row by row
+        self._create_indexes(cursor)
         
         conn.commit()
         conn.close()
+        # Query handlers on this database drop the state they built from the previous data
+        _bump_endpoint_generation(os.path.abspath(self._dbPathOrUrl))
         
         print(f"Data successfully loaded into SQLite database {self._dbPathOrUrl}")
         return True
@@ -236,33 +289,57 @@ class CategoryUploadHandler(UploadHandler):
             )
         ''')
     
-    def _insert_data(self, cursor, scimago_data: List[Dict[str, Any]]) -> None:
+    def _create_indexes(self, cursor) -> None:
+        # The primary keys already cover lookups by issn; these cover lookups
+        # by category or area (issn included, so the link table is not read)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jc_category ON journal_categories (category_id, issn)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ja_area ON journal_areas (area_id, issn)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_categories_quartile ON categories (quartile, id)')
+    
+    def _insert_data(self, cursor, scimago_data: Iterable[Dict[str, Any]]) -> None:
+        entries = iter(scimago_data)
+        while True:
+            batch = list(islice(entries, self._INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            self._insert_batch(cursor, batch)
+
+    def _insert_batch(self, cursor, scimago_data: List[Dict[str, Any]]) -> None:
+        # Collect the rows of each table, then insert them with one executemany per table
+        area_rows = []
+        category_rows = []
+        journal_category_rows = []
+        journal_area_rows = []
+
         for entry in scimago_data:
             identifiers = entry.get('identifiers', [])
             categories = entry.get('categories', [])
             areas = entry.get('areas', [])
             
-            # Insert areas
+            # Areas
             for area in areas:
-                cursor.execute('INSERT OR IGNORE INTO areas (id) VALUES (?)', (area,))
+                area_rows.append((area,))
             
-            # Insert categories
+            # Categories
             for category in categories:
-                category_id = category.get('id')
-                quartile = category.get('quartile')
-                cursor.execute('INSERT OR IGNORE INTO categories (id, quartile) VALUES (?, ?)', 
-                             (category_id, quartile))
+                category_rows.append((category.get('id'), category.get('quartile')))
             
-            # Insert links journal-category
+            # Links journal-category
             for issn in identifiers:
                 for category in categories:
-                    category_id = category.get('id')
-                    quartile = category.get('quartile')
-                    cursor.execute('INSERT OR IGNORE INTO journal_categories (issn, category_id, quartile) VALUES (?, ?, ?)',
-                                 (issn, category_id, quartile))
+                    journal_category_rows.append((issn, category.get('id'), category.get('quartile')))
             
-            # Insert links journal-area
+            # Links journal-area
             for issn in identifiers:
                 for area in areas:
-                    cursor.execute('INSERT OR IGNORE INTO journal_areas (issn, area_id) VALUES (?, ?)',
-                                 (issn, area))
\ No newline at end of file
+                    journal_area_rows.append((issn, area))
+
+        # Drop repeated rows before SQLite sees them; dict.fromkeys keeps first-seen order,
+        # so INSERT OR IGNORE still keeps the first quartile of each key
+        cursor.executemany('INSERT OR IGNORE INTO areas (id) VALUES (?)', dict.fromkeys(area_rows))
+        cursor.executemany('INSERT OR IGNORE INTO categories (id, quartile) VALUES (?, ?)',
+                           dict.fromkeys(category_rows))
+        cursor.executemany('INSERT OR IGNORE INTO journal_categories (issn, category_id, quartile) VALUES (?, ?, ?)',
+                           dict.fromkeys(journal_category_rows))
+        cursor.executemany('INSERT OR IGNORE INTO journal_areas (issn, area_id) VALUES (?, ?)',
+                           dict.fromkeys(journal_area_rows))
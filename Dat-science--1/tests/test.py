@@ -13,7 +13,6 @@
 # ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
 # SOFTWARE.
 import unittest
-from os import sep
 from pandas import DataFrame
 import sys
 import os
@@ -33,9 +32,12 @@ class TestProjectBasic(unittest.TestCase):
     # the SPARQL endpoint must be updated depending on how you launch it - currently, it is
     # specified the URL introduced during the course, which is the one used for a standard
     # launch of the database.
-    journal = ".." + sep + "data" + sep + "doaj.csv"
-    category = ".." + sep + "data" + sep + "scimago.json"
-    relational = ".." + sep + "relational.db"
+    # The local files are resolved once, relative to this file, so that the tests can be
+    # launched from any working directory.
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    journal = os.path.join(root, "data", "doaj.csv")
+    category = os.path.join(root, "data", "scimago.json")
+    relational = os.path.join(root, "relational.db")
     graph = "http://localhost:8889/bigdata/sparql"
     
     def test_01_JournalUploadHandler(self):
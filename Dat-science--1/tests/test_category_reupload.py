@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import CategoryUploadHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import Category
+
+# Tests that what the category handler and the engine keep in memory (id set, area index,
+# memoized ISSN lookups) follows a new upload to the same SQLite file. Only SQLite is used.
+
+class TestCategoryReupload(unittest.TestCase):
+
+    first = [{"identifiers": ["1111-1111"], "categories": [{"id": "Cat A", "quartile": "Q1"}],
+              "areas": ["Area A"]}]
+    second = [{"identifiers": ["2222-2222"], "categories": [{"id": "Cat B", "quartile": "Q2"}],
+               "areas": ["Area B"]}]
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.first_path = self.write(folder, "first.json", self.first)
+        self.second_path = self.write(folder, "second.json", self.second)
+
+        # The upload handler uses a relative path and the query handler an absolute one
+        self.relational = os.path.join(folder, "relational.db")
+        cwd = os.getcwd()
+        os.chdir(folder)
+        self.addCleanup(os.chdir, cwd)
+        self.upload = CategoryUploadHandler()
+        self.upload.setDbPathOrUrl("relational.db")
+        self.assertTrue(self.upload.pushDataToDb(self.first_path))
+
+        self.query = CategoryQueryHandler()
+        self.query.setDbPathOrUrl(self.relational)
+        self.addCleanup(self.query.closeConnection)
+        self.engine = FullQueryEngine()
+        self.engine.addCategoryHandler(self.query)
+
+    @staticmethod
+    def write(folder: str, name: str, data: list) -> str:
+        path = os.path.join(folder, name)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        return path
+
+    def reupload(self):
+        self.assertTrue(self.upload.pushDataToDb(self.second_path))
+
+    def test_handler_id_set(self):
+        self.assertFalse(self.query.supportsId("Cat B"))
+        self.reupload()
+        self.assertTrue(self.query.supportsId("Cat B"))
+        self.assertTrue(self.query.supportsId("Area B"))
+
+    def test_handler_area_index(self):
+        self.assertEqual(self.query.getIssnsForAreas({"Area B"}), set())
+        self.reupload()
+        self.assertEqual(self.query.getIssnsForAreas({"Area B"}), {"2222-2222"})
+
+    def test_engine_entity(self):
+        self.assertIsNone(self.engine.getEntityById("Cat B"))
+        self.reupload()
+        entity = self.engine.getEntityById("Cat B")
+        self.assertIsInstance(entity, Category)
+        self.assertEqual(entity.getQuartile(), "Q2")
+
+    def test_engine_cached_lookups(self):
+        self.assertEqual(set(self.engine._get_issns_for_areas(self.query, {"Area B"})), set())
+        self.assertEqual(self.engine._plan_categories_quartile_join({"Cat B"}, set()), set())
+        self.reupload()
+        self.assertEqual(set(self.engine._get_issns_for_areas(self.query, {"Area B"})), {"2222-2222"})
+        self.assertEqual(self.engine._plan_categories_quartile_join({"Cat B"}, set()), {"2222-2222"})
+        self.assertEqual(self.engine._plan_categories_quartile_join(set(), {"Q2"}), {"2222-2222"})
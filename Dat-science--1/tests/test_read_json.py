@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.upload_handlers import CategoryUploadHandler
+
+# Tests of the incremental reader of SCImago JSON files, which must yield exactly
+# the items json.load returns, wherever the read chunks happen to end.
+
+class TestReadJsonFile(unittest.TestCase):
+
+    scimago = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "scimago.json")
+
+    edge_cases = [
+        '[]',
+        ' \n\t[ ]\n',
+        '[1]',
+        '[1, 22, 333, -4.5e10, 0.25, true, false, null]',
+        '[12345678901234567890,1e-7 ,  -0]',
+        '["a,]", "b\\"]", "\\\\", "\\u00e8\\n", "[{}]"]',
+        '[{"identifiers": ["1234-5678"], "categories": [{"id": "A, B", "quartile": "Q1"}], "areas": []},\n'
+        ' {"identifiers": [], "categories": [], "areas": ["Arts and Humanities"]}]',
+        '[[], [[]], {"a": {"b": [1, {"c": "]"}]}}]\n',
+        '  [ "caffè" ,"漢字"  ]  ',
+    ]
+
+    def read(self, path: str, chunk_size: int) -> list:
+        handler = CategoryUploadHandler()
+        handler._READ_CHUNK_SIZE = chunk_size
+        return list(handler._read_json_file(path))
+
+    def write(self, text: str) -> str:
+        file = tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.json', delete=False)
+        with file:
+            file.write(text)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_scimago_file(self):
+        with open(self.scimago, encoding='utf-8') as file:
+            expected = json.load(file)
+        for chunk_size in (7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.read(self.scimago, chunk_size), expected)
+
+    def test_edge_cases(self):
+        for text in self.edge_cases:
+            path = self.write(text)
+            for chunk_size in (1, 2, 3, 7, 64):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(self.read(path, chunk_size), json.loads(text))
+
+    def test_invalid_files(self):
+        for text in ('', '   ', '{"a": 1}', '"[1]"', '[1, 2', '[1 2]', '[{"a": 1}, {"b":', '[1, 2,'):
+            path = self.write(text)
+            for chunk_size in (1, 3, 64):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    with self.assertRaises(ValueError):
+                        self.read(path, chunk_size)